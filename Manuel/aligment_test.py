@@ -1,10 +1,12 @@
-from datetime import timedelta, datetime
+from datetime import timedelta
 
 import cv2
 import numpy as np
 import csv
 import os
 
+from file_scanner import iter_files, index_by_prefix, parse_image_time
+
 
 def csv_to_color_image(csv_path):
     """
@@ -98,48 +100,6 @@ def align_images(rgb_image_path, csv_path, output_path):
     print(f"Gespeichertes ausgerichtetes Bild: {output_file}")
 
 
-def find_files_with_prefix(directory, prefix):
-    """
-    Sucht nach Dateien in einem Verzeichnis, die mit einem bestimmten Präfix beginnen.
-
-    :param directory: Verzeichnis, in dem gesucht werden soll
-    :param prefix: Präfix, nach dem gesucht werden soll
-    :return: Liste der passenden Dateien
-    """
-    matching_files = []
-    try:
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if file.startswith(prefix):
-                    matching_files.append(os.path.join(root, file))
-    except Exception as e:
-        print(f"Fehler bei der Suche: {e}")
-    return matching_files
-
-
-def parse_image_time(filename):
-    # Handle filenames without extensions
-    try:
-        if '.' in filename:
-            base, ext = filename.split('.')
-        else:
-            base = filename
-
-        if len(base) < 12:
-            return None  # Skip invalid filenames
-
-        year = int("20" + base[1:3])  # Add '20' to the year
-        month = int(base[3:5])
-        day = int(base[5:7])
-        hour = int(base[7:9])
-        minute = int(base[9:11])
-
-        return datetime(year, month, day, hour, minute)
-    except Exception as e:
-        # print(f"Error parsing {filename}: {e}")
-        return None
-
-
 def find_nearest_image(target_filename, filenames, time_window=20):
     target_time = parse_image_time(target_filename)
     if target_time is None:
@@ -163,17 +123,18 @@ def find_nearest_image(target_filename, filenames, time_window=20):
 
 # Beispiel: Bearbeitung eines Datasets
 def process_dataset(rgb_dir, csv_dir, output_dir):
-    for rgb_file in os.listdir(rgb_dir):
-        if rgb_file.endswith('.jpg'):
-            rgb_path = os.path.join(rgb_dir, rgb_file)
-            csv_filenames = find_files_with_prefix(csv_dir, prefix=rgb_file[0:5])
-            csv_path = find_nearest_image(rgb_file, csv_filenames, time_window=20)
-            print(rgb_file)
-            print(csv_path)
-            if csv_path is None:
-                continue
-            if os.path.exists(csv_path):
-                align_images(rgb_path, csv_path, output_dir)
+    # CSV-Verzeichnis nur einmal durchsuchen statt einmal pro RGB-Bild
+    csv_index = index_by_prefix(iter_files(csv_dir, recursive=True))
+    for rgb_path in iter_files(rgb_dir, extensions=('.jpg',)):
+        rgb_file = os.path.basename(rgb_path)
+        csv_filenames = csv_index.get(rgb_file[0:5], [])
+        csv_path = find_nearest_image(rgb_file, csv_filenames, time_window=20)
+        print(rgb_file)
+        print(csv_path)
+        if csv_path is None:
+            continue
+        if os.path.exists(csv_path):
+            align_images(rgb_path, csv_path, output_dir)
 
 
 # Eingaben anpassen
@@ -0,0 +1,292 @@
+from datetime import datetime
+import json
+import os
+import time
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+
+SNAPSHOT_VERSION = 2
+
+# Gröbste übliche Auflösung von Änderungszeiten (FAT/exFAT/SMB: 2 Sekunden)
+MTIME_RESOLUTION_NS = 2_000_000_000
+
+
+def parse_image_time(filename):
+    """
+    Extrahiert die Zeitinformationen aus einem Dateinamen (z.B. m201014151452528.jpg),
+    ohne auf das Dateisystem zuzugreifen.
+
+    :param filename: Dateiname (ohne Verzeichnis).
+    :return: Datetime-Objekt oder None, wenn der Name ungültig ist.
+    """
+    if len(filename) < 12:
+        return None  # Überspringe ungültige Dateinamen
+    try:
+        year = int("20" + filename[1:3])  # Addiere '20' zum Jahr
+        month = int(filename[3:5])
+        day = int(filename[5:7])
+        hour = int(filename[7:9])
+        minute = int(filename[9:11])
+        return datetime(year, month, day, hour, minute)
+    except ValueError:
+        return None
+
+
+def _scan_directory(directory):
+    """
+    Liest ein einzelnes Verzeichnis mit os.scandir und liefert (Eintrag, ist_verzeichnis).
+    Der Dateityp kommt aus dem Verzeichniseintrag selbst, daher ist pro Eintrag kein
+    zusätzlicher stat-Aufruf nötig. Lesbare Einträge werden trotz Fehlern weiter geliefert,
+    danach wird der erste Fehler ausgelöst, damit der Aufrufer weiß, dass die Liste
+    unvollständig ist.
+
+    :param directory: Verzeichnis, das gelesen werden soll.
+    :raises OSError: Wenn das Verzeichnis nicht vollständig gelesen werden konnte.
+    """
+    error = None
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            try:
+                if entry.is_file():
+                    yield entry, False
+                elif entry.is_dir(follow_symlinks=False):
+                    yield entry, True
+            except OSError as e:
+                error = error or e
+    if error is not None:
+        raise error
+
+
+def _read_directory(directory):
+    """
+    Liest ein einzelnes Verzeichnis vollständig ein.
+
+    :param directory: Verzeichnis, das gelesen werden soll.
+    :return: Tupel (Dateinamen, Unterverzeichnisnamen).
+    :raises OSError: Wenn das Verzeichnis nicht vollständig gelesen werden konnte.
+    """
+    files = []
+    subdirs = []
+    for entry, is_dir in _scan_directory(directory):
+        if is_dir:
+            subdirs.append(entry.name)
+        else:
+            files.append(entry.name)
+    return files, subdirs
+
+
+def _walk(directory, recursive):
+    """
+    Liefert (Verzeichnis, Dateiname) für jede Datei, ohne die Liste vorher aufzubauen.
+    Fehler im Startverzeichnis werden weitergereicht, Fehler in Unterverzeichnissen nur ausgegeben.
+    """
+    pending = [directory]
+    while pending:
+        current = pending.pop()
+        try:
+            for entry, is_dir in _scan_directory(current):
+                if not is_dir:
+                    yield current, entry.name
+                elif recursive:
+                    pending.append(entry.path)
+        except OSError as e:
+            if current == directory:
+                raise
+            print(f"Fehler beim Lesen von {current}: {e}")
+
+
+def _load_snapshot(snapshot_file, root):
+    """
+    Lädt eine gespeicherte Verzeichnisliste. Fehlt die Datei, ist sie unbrauchbar oder
+    gehört sie zu einem anderen Verzeichnis, wird alles neu eingelesen.
+    """
+    try:
+        with open(snapshot_file, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        if data.get("version") != SNAPSHOT_VERSION:
+            print(f"Snapshot {snapshot_file} hat eine andere Version und wird ignoriert")
+        elif data.get("root") != root:
+            print(f"Snapshot {snapshot_file} gehört zu {data.get('root')} und wird ignoriert")
+        else:
+            return data["dirs"]
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError, AttributeError) as e:
+        print(f"Snapshot {snapshot_file} wird ignoriert: {e}")
+    return {}
+
+
+def _save_snapshot(snapshot_file, root, dirs):
+    """
+    Schreibt die Verzeichnisliste atomar, damit ein Abbruch keinen halben Snapshot hinterlässt.
+    """
+    tmp_file = snapshot_file + ".tmp"
+    try:
+        with open(tmp_file, 'w', encoding='utf-8') as file:
+            json.dump({"version": SNAPSHOT_VERSION, "root": root, "dirs": dirs}, file)
+        os.replace(tmp_file, snapshot_file)
+    except OSError as e:
+        print(f"Fehler beim Speichern des Snapshots {snapshot_file}: {e}")
+
+
+def _is_unchanged(cached, mtime_ns):
+    """
+    Prüft, ob ein Verzeichnis seit dem letzten Einlesen unverändert ist. Lag die Änderungszeit
+    beim Einlesen weniger als MTIME_RESOLUTION_NS zurück, kann im selben Zeitstempel-Intervall
+    noch eine Datei dazugekommen sein, ohne dass sich die Änderungszeit ändert. Dann wird das
+    Verzeichnis sicherheitshalber neu gelesen.
+    """
+    return (cached is not None
+            and cached["mtime_ns"] == mtime_ns
+            and cached["read_ns"] - mtime_ns > MTIME_RESOLUTION_NS)
+
+
+def _walk_with_snapshot(directory, recursive, snapshot_file, only_new):
+    """
+    Wie _walk, aber mit persistenter Verzeichnisliste. Verzeichnisse, deren Änderungszeit
+    sich seit dem letzten Lauf nicht geändert hat, werden nicht erneut gelesen.
+    Kann ein Unterverzeichnis nicht gelesen werden, bleibt sein bisheriger Eintrag erhalten.
+    Der Snapshot wird erst geschrieben, wenn alle Einträge abgearbeitet wurden.
+    """
+    root = os.path.abspath(directory)
+    old_dirs = _load_snapshot(snapshot_file, root)
+    # Ohne Rekursion werden Unterverzeichnisse nicht besucht, ihre Einträge bleiben erhalten.
+    # Ein rekursiver Lauf sieht alle noch vorhandenen Verzeichnisse und ersetzt den Snapshot.
+    new_dirs = {} if recursive else dict(old_dirs)
+    pending = [directory]
+    while pending:
+        current = pending.pop()
+        key = os.path.relpath(current, directory)
+        cached = old_dirs.get(key)
+        try:
+            mtime_ns = os.stat(current).st_mtime_ns
+            if _is_unchanged(cached, mtime_ns):
+                files, subdirs, read_ns = cached["files"], cached["subdirs"], cached["read_ns"]
+                known = files
+            else:
+                read_ns = time.time_ns()
+                files, subdirs = _read_directory(current)
+                known = cached["files"] if cached is not None else ()
+        except OSError as e:
+            if current == directory:
+                raise
+            print(f"Fehler beim Lesen von {current}: {e}")
+            # Bisherigen Stand behalten, damit die Dateien beim nächsten Lauf nicht als neu gelten
+            if cached is not None:
+                new_dirs[key] = cached
+                if recursive:
+                    pending.extend(os.path.join(current, name) for name in cached["subdirs"])
+            continue
+        new_dirs[key] = {"mtime_ns": mtime_ns, "read_ns": read_ns, "files": files, "subdirs": subdirs}
+
+        if only_new:
+            known = set(known)
+            for name in files:
+                if name not in known:
+                    yield current, name
+        else:
+            for name in files:
+                yield current, name
+
+        if recursive:
+            pending.extend(os.path.join(current, name) for name in subdirs)
+
+    _save_snapshot(snapshot_file, root, new_dirs)
+
+
+def iter_files(directory, extensions=None, prefix=None, start=None, end=None,
+               recursive=False, snapshot_file=None, only_new=False):
+    """
+    Durchläuft die Dateien eines Verzeichnisses als Generator mit os.scandir.
+    Alle Filter arbeiten nur auf dem Dateinamen, es wird kein os.path.isfile benötigt.
+
+    :param directory: Verzeichnis, das durchsucht werden soll.
+    :param extensions: Tupel erlaubter Endungen (Groß-/Kleinschreibung egal) oder None.
+    :param prefix: Präfix, mit dem der Dateiname beginnen muss, oder None.
+    :param start: Früheste Aufnahmezeit laut Dateiname (inklusive) oder None.
+    :param end: Späteste Aufnahmezeit laut Dateiname (inklusive) oder None.
+    :param recursive: Unterverzeichnisse mit durchsuchen.
+    :param snapshot_file: Pfad für eine persistente Verzeichnisliste oder None.
+    :param only_new: Nur Dateien liefern, die im letzten Snapshot noch nicht enthalten waren.
+        Der Snapshot ist nur eine Verzeichnisliste; welche Dateien tatsächlich verarbeitet
+        wurden, hält ProcessedLog fest.
+    :return: Generator über die Pfade der passenden Dateien.
+    :raises OSError: Wenn das Startverzeichnis selbst nicht gelesen werden kann. Fehler in
+        Unterverzeichnissen werden nur ausgegeben.
+    """
+    if extensions is not None:
+        extensions = tuple(ext.lower() for ext in extensions)
+
+    if snapshot_file is not None:
+        entries = _walk_with_snapshot(directory, recursive, snapshot_file, only_new)
+    else:
+        entries = _walk(directory, recursive)
+
+    for root, name in entries:
+        if extensions is not None and not name.lower().endswith(extensions):
+            continue
+        if prefix is not None and not name.startswith(prefix):
+            continue
+        if start is not None or end is not None:
+            file_time = parse_image_time(name)
+            if file_time is None:
+                continue
+            if start is not None and file_time < start:
+                continue
+            if end is not None and file_time > end:
+                continue
+        yield os.path.join(root, name)
+
+
+def index_by_prefix(paths, prefix_length=5):
+    """
+    Gruppiert Dateipfade nach dem Anfang ihres Dateinamens, damit nicht für jedes Bild
+    erneut das ganze Verzeichnis durchsucht werden muss.
+
+    :param paths: Iterierbare Dateipfade, z.B. aus iter_files.
+    :param prefix_length: Anzahl der Zeichen, nach denen gruppiert wird.
+    :return: Dictionary Präfix -> Liste von Pfaden.
+    """
+    index = {}
+    for path in paths:
+        index.setdefault(os.path.basename(path)[:prefix_length], []).append(path)
+    return index
+
+
+class ProcessedLog:
+    """
+    Hält fest, welche Dateien bereits erfolgreich verarbeitet wurden. Jeder Eintrag wird
+    sofort an die Datei angehängt, sodass ein abgebrochener Lauf beim nächsten Mal dort
+    weitermacht, wo er aufgehört hat.
+    """
+
+    def __init__(self, log_file):
+        self.log_file = log_file
+        self.done = set()
+        try:
+            with open(log_file, 'r', encoding='utf-8') as file:
+                self.done = {line.rstrip('\n') for line in file if line.strip()}
+        except FileNotFoundError:
+            pass
+        self.file = open(log_file, 'a', encoding='utf-8', buffering=1)
+
+    def __contains__(self, name):
+        return name in self.done
+
+    def mark_done(self, name):
+        """
+        Markiert eine Datei als verarbeitet. Erst nach erfolgreicher Verarbeitung aufrufen.
+        """
+        if name not in self.done:
+            self.done.add(name)
+            self.file.write(name + "\n")
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
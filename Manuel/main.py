@@ -2,8 +2,11 @@ import cv2
 import numpy as np
 import os
 import shutil
+from contextlib import nullcontext
 from tqdm import tqdm  # Für die Fortschrittsanzeige
 
+from file_scanner import IMAGE_EXTENSIONS, ProcessedLog, iter_files
+
 
 def analyze_image(image_path):
     """
@@ -33,10 +36,14 @@ def analyze_image(image_path):
         return "Nebel"
 
 
-def process_images(input_folder, fog_folder, not_fog_folder):
+def process_images(input_folder, fog_folder, not_fog_folder, snapshot_file=None, processed_file=None):
     """
     Verarbeitet alle Bilder in einem Ordner und verschiebt jene mit Nebel in einen Zielordner.
-    Zeigt den Fortschritt mit einer Progressbar an.
+    Zeigt den Fortschritt mit einer Progressbar an. Da die Bilder gestreamt werden, ist die
+    Gesamtzahl vorab nicht bekannt; die Progressbar zählt daher nur mit, ohne Prozent und Restzeit.
+    Mit processed_file werden erfolgreich kopierte Bilder festgehalten und bei wiederholten
+    oder abgebrochenen Läufen übersprungen. snapshot_file spart das erneute Einlesen
+    unveränderter Verzeichnisse.
     """
     if not os.path.exists(fog_folder):
         os.makedirs(fog_folder)
@@ -44,27 +51,32 @@ def process_images(input_folder, fog_folder, not_fog_folder):
     if not os.path.exists(not_fog_folder):
         os.makedirs(not_fog_folder)
 
-    # Liste aller Bilddateien im Eingabeordner
-    image_files = [
-        file_name for file_name in os.listdir(input_folder)
-        if os.path.isfile(os.path.join(input_folder, file_name)) and file_name.lower().endswith(
-            ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff'))
-    ]
-
-    # Fortschrittsanzeige initialisieren
-    for file_name in tqdm(image_files, desc="Bilder verarbeiten", unit="Bild"):
-        file_path = os.path.join(input_folder, file_name)
-        try:
-            # Analyse des Bildes
-            result = analyze_image(file_path)
-
-            # Falls Nebel erkannt wird, kopiere das Bild in den Zielordner
-            if result == "Nebel":
-                shutil.copy(file_path, os.path.join(fog_folder, file_name))
-            else:
-                shutil.copy(file_path, os.path.join(not_fog_folder, file_name))
-        except Exception as e:
-            print(f"Fehler bei der Verarbeitung von {file_name}: {e}")
+    # Bilddateien im Eingabeordner werden gestreamt statt vorab als Liste aufgebaut
+    image_files = iter_files(input_folder, extensions=IMAGE_EXTENSIONS, snapshot_file=snapshot_file)
+    processed_log = ProcessedLog(processed_file) if processed_file is not None else nullcontext()
+
+    with processed_log as processed:
+        # Fortschrittsanzeige initialisieren
+        for file_path in tqdm(image_files, desc="Bilder verarbeiten", unit="Bild"):
+            file_name = os.path.basename(file_path)
+            if processed is not None and file_name in processed:
+                continue
+            try:
+                # Analyse des Bildes
+                result = analyze_image(file_path)
+
+                # Falls Nebel erkannt wird, kopiere das Bild in den Zielordner
+                if result == "Nebel":
+                    shutil.copy(file_path, os.path.join(fog_folder, file_name))
+                else:
+                    shutil.copy(file_path, os.path.join(not_fog_folder, file_name))
+            except Exception as e:
+                print(f"Fehler bei der Verarbeitung von {file_name}: {e}")
+                continue
+
+            # Nur erfolgreich kopierte Bilder gelten als verarbeitet
+            if processed is not None:
+                processed.mark_done(file_name)
 
 
 # Ordnerpfade
@@ -1,47 +1,7 @@
-from datetime import timedelta, datetime
+from datetime import timedelta
 import os
 
-
-def find_csv_files_with_prefix(directory, prefix):
-    """
-    Sucht nach Dateien in einem Verzeichnis, die mit einem bestimmten Präfix beginnen.
-
-    :param directory: Verzeichnis, in dem gesucht werden soll
-    :param prefix: Präfix, nach dem gesucht werden soll
-    :return: Liste der passenden Dateien
-    """
-    matching_files = []
-    try:
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if file.endswith(".csv"):
-                    if file.startswith(prefix):
-                        matching_files.append(os.path.join(root, file))
-    except Exception as e:
-        print(f"Fehler bei der Suche: {e}")
-    return matching_files
-
-
-def parse_image_time(filename):
-    """
-    Extrahiert die Zeitinformationen aus einem Dateinamen im erwarteten Format.
-
-    :param filename: Dateiname, aus dem Zeitinformationen extrahiert werden sollen.
-    :return: Datetime-Objekt oder None, wenn der Name ungültig ist.
-    """
-    try:
-        if len(filename) < 12:
-            return None  # Überspringe ungültige Dateinamen
-
-        year = int("20" + filename[1:3])  # Addiere '20' zum Jahr
-        month = int(filename[3:5])
-        day = int(filename[5:7])
-        hour = int(filename[7:9])
-        minute = int(filename[9:11])
-        return datetime(year, month, day, hour, minute)
-    except Exception as e:
-        print(f"Error by parsing image to time: {e}")
-        return None
+from file_scanner import iter_files, index_by_prefix, parse_image_time
 
 
 def find_nearest_image(target_filename, filenames, time_window=20):
@@ -89,7 +49,8 @@ def save_pairs_to_file(pairs, output_file):
         print(f"Fehler beim Speichern der Paare: {e}")
 
 
-def find_image_pairs(rgb_dir, csv_dir, output_file, time_window=20):
+def find_image_pairs(rgb_dir, csv_dir, output_file, time_window=20, start=None, end=None,
+                     snapshot_dir=None):
     """
     Findet und speichert Bildpaare basierend auf Zeitinformationen.
 
@@ -97,15 +58,30 @@ def find_image_pairs(rgb_dir, csv_dir, output_file, time_window=20):
     :param csv_dir: Verzeichnis mit CSV-Dateien (Infrarot).
     :param output_file: Pfad zur Ausgabedatei, in der die Paare gespeichert werden.
     :param time_window: Zeitfenster in Minuten.
+    :param start: Früheste Aufnahmezeit der RGB-Bilder oder None.
+    :param end: Späteste Aufnahmezeit der RGB-Bilder oder None.
+    :param snapshot_dir: Verzeichnis für die Snapshots der Verzeichnislisten oder None.
     """
+    rgb_snapshot = csv_snapshot = None
+    if snapshot_dir is not None:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        rgb_snapshot = os.path.join(snapshot_dir, "rgb_listing.json")
+        csv_snapshot = os.path.join(snapshot_dir, "csv_listing.json")
+
+    # CSV-Dateien nur einmal einlesen und nach Präfix gruppieren
+    csv_start = start - timedelta(minutes=time_window) if start is not None else None
+    csv_end = end + timedelta(minutes=time_window) if end is not None else None
+    csv_index = index_by_prefix(iter_files(csv_dir, extensions=('.csv',), start=csv_start, end=csv_end,
+                                           recursive=True, snapshot_file=csv_snapshot))
+
     pairs = []
-    for rgb_file in os.listdir(rgb_dir):
-        if rgb_file.endswith('.jpg'):
-            rgb_path = os.path.join(rgb_dir, rgb_file)
-            csv_filenames = find_csv_files_with_prefix(csv_dir, prefix=rgb_file[0:5])
-            csv_path = find_nearest_image(rgb_file, csv_filenames, time_window)
-            if csv_path is not None:
-                pairs.append((rgb_path, csv_path))
+    for rgb_path in iter_files(rgb_dir, extensions=('.jpg',), start=start, end=end,
+                               snapshot_file=rgb_snapshot):
+        rgb_file = os.path.basename(rgb_path)
+        csv_filenames = csv_index.get(rgb_file[0:5], [])
+        csv_path = find_nearest_image(rgb_file, csv_filenames, time_window)
+        if csv_path is not None:
+            pairs.append((rgb_path, csv_path))
 
     # Speichere die Paare in einer Datei
     save_pairs_to_file(pairs, output_file)
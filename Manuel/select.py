@@ -1,10 +1,11 @@
 import cv2
 import numpy as np
-import os
 import matplotlib.pyplot as plt
 from tkinter import Tk, Label, Button, filedialog, Frame
 from PIL import Image, ImageTk
 
+from file_scanner import IMAGE_EXTENSIONS, iter_files
+
 
 class ImageClassifierApp:
     def __init__(self, root, input_folder):
@@ -12,11 +13,7 @@ class ImageClassifierApp:
         self.root.title("Image Classifier")
 
         self.input_folder = input_folder
-        self.image_files = [
-            f for f in os.listdir(input_folder)
-            if os.path.isfile(os.path.join(input_folder, f)) and f.lower().endswith(
-                ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff'))
-        ]
+        self.image_files = list(iter_files(input_folder, extensions=IMAGE_EXTENSIONS))
         self.current_image_index = 0
         self.points = []  # Stores data points for plotting
 
@@ -77,7 +74,7 @@ class ImageClassifierApp:
         Displays the current image in the GUI.
         """
         if self.current_image_index < len(self.image_files):
-            image_path = os.path.join(self.input_folder, self.image_files[self.current_image_index])
+            image_path = self.image_files[self.current_image_index]
             pil_image = Image.open(image_path)
             resized_image = self.resize_image(pil_image)
             tk_image = ImageTk.PhotoImage(resized_image)
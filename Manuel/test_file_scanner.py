@@ -0,0 +1,237 @@
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from file_scanner import (MTIME_RESOLUTION_NS, ProcessedLog, index_by_prefix, iter_files,
+                          parse_image_time)
+
+
+def touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'w').close()
+
+
+def backdate(directory, seconds=60):
+    """Setzt die Änderungszeit weit genug zurück, damit der Snapshot ihr vertraut."""
+    past = os.stat(directory).st_mtime_ns - seconds * 1_000_000_000
+    os.utime(directory, ns=(past, past))
+    return past
+
+
+def names(paths):
+    return sorted(os.path.relpath(path) for path in paths)
+
+
+def load_json(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def fail_scandir_once(monkeypatch, failing_path):
+    """Lässt os.scandir für ein Verzeichnis einmal mit PermissionError scheitern."""
+    real_scandir = os.scandir
+    calls = []
+
+    def scandir(path):
+        if os.path.normpath(path) == failing_path and not calls:
+            calls.append(path)
+            raise PermissionError(13, "Permission denied", path)
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", scandir)
+    return calls
+
+
+def scan(root, snapshot, recursive=True, only_new=True):
+    return names(iter_files(str(root), recursive=recursive, snapshot_file=str(snapshot), only_new=only_new))
+
+
+def test_parse_image_time():
+    assert parse_image_time("m201014151452528.jpg") == datetime(2020, 10, 14, 15, 14)
+    assert parse_image_time("m2010141514.csv") == datetime(2020, 10, 14, 15, 14)
+    assert parse_image_time("x.txt") is None
+    assert parse_image_time("abcdefghijkl.jpg") is None
+
+
+def test_filters(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    touch("d/m201014151452528.jpg")
+    touch("d/m201014161452528.JPG")
+    touch("d/notes.txt")
+    touch("d/sub/m201014153119130.csv")
+
+    assert names(iter_files("d", extensions=('.jpg',))) == [
+        "d/m201014151452528.jpg", "d/m201014161452528.JPG"]
+    assert names(iter_files("d", prefix="m2010141")) == [
+        "d/m201014151452528.jpg", "d/m201014161452528.JPG"]
+    assert names(iter_files("d", recursive=True, start=datetime(2020, 10, 14, 15, 30),
+                            end=datetime(2020, 10, 14, 16, 0))) == ["d/sub/m201014153119130.csv"]
+
+
+def test_index_by_prefix():
+    index = index_by_prefix(["a/m2010x.csv", "b/m2010y.csv", "m2011z.csv"])
+    assert index == {"m2010": ["a/m2010x.csv", "b/m2010y.csv"], "m2011": ["m2011z.csv"]}
+
+
+def test_snapshot_only_new(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    touch("d/a.jpg")
+    touch("d/sub/b.jpg")
+
+    assert scan("d", "snap.json") == ["d/a.jpg", "d/sub/b.jpg"]
+    assert scan("d", "snap.json") == []
+
+    touch("d/sub/c.jpg")
+    assert scan("d", "snap.json") == ["d/sub/c.jpg"]
+    assert scan("d", "snap.json", only_new=False) == ["d/a.jpg", "d/sub/b.jpg", "d/sub/c.jpg"]
+
+
+def test_snapshot_skips_unchanged_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    touch("d/a.jpg")
+    mtime_ns = backdate("d")
+    assert scan("d", "snap.json") == ["d/a.jpg"]
+
+    # Neue Datei, aber unveränderte Änderungszeit: das Verzeichnis wird nicht erneut gelesen
+    touch("d/b.jpg")
+    os.utime("d", ns=(mtime_ns, mtime_ns))
+    assert scan("d", "snap.json", only_new=False) == ["d/a.jpg"]
+
+
+def test_snapshot_rereads_racily_clean_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    touch("d/a.jpg")
+    assert scan("d", "snap.json") == ["d/a.jpg"]
+
+    # Neue Datei im selben Zeitstempel-Intervall: die Änderungszeit bleibt gleich
+    entry = load_json("snap.json")["dirs"]["."]
+    touch("d/b.jpg")
+    os.utime("d", ns=(entry["mtime_ns"], entry["mtime_ns"]))
+    assert entry["read_ns"] - entry["mtime_ns"] <= MTIME_RESOLUTION_NS
+    assert scan("d", "snap.json") == ["d/b.jpg"]
+
+
+def test_snapshot_switching_recursive_mode(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    touch("d/a.jpg")
+    touch("d/sub/b.jpg")
+
+    assert scan("d", "snap.json") == ["d/a.jpg", "d/sub/b.jpg"]
+    assert scan("d", "snap.json", recursive=False) == []
+    assert scan("d", "snap.json") == []
+
+
+def test_snapshot_missing_or_wrong_version(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    touch("d/a.jpg")
+    assert scan("d", "missing/snap.json") == ["d/a.jpg"]
+
+    assert scan("d", "snap.json") == ["d/a.jpg"]
+    data = load_json("snap.json")
+    data["version"] = 1
+    with open("snap.json", 'w', encoding='utf-8') as file:
+        json.dump(data, file)
+    assert scan("d", "snap.json") == ["d/a.jpg"]
+
+    with open("snap.json", 'w') as file:
+        file.write("{kaputt")
+    assert scan("d", "snap.json") == ["d/a.jpg"]
+
+
+def test_snapshot_belongs_to_one_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    touch("d/a.jpg")
+    touch("e/a.jpg")
+
+    assert scan("d", "snap.json") == ["d/a.jpg"]
+    assert scan("e", "snap.json") == ["e/a.jpg"]
+
+
+def test_snapshot_not_saved_when_interrupted(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    touch("d/a.jpg")
+    touch("d/b.jpg")
+
+    files = iter_files("d", snapshot_file="snap.json", only_new=True)
+    next(files)
+    files.close()
+    assert not os.path.exists("snap.json")
+
+
+def test_failed_subdirectory_read_is_not_cached(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    touch("d/a.jpg")
+    touch("d/sub/deep/b.jpg")
+    # Alte Änderungszeiten, damit ein fälschlich gespeicherter Eintrag beim nächsten Lauf gelten würde
+    backdate("d/sub")
+    backdate("d")
+
+    calls = fail_scandir_once(monkeypatch, os.path.join("d", "sub"))
+    assert scan("d", "snap.json") == ["d/a.jpg"]
+    assert calls
+
+    assert scan("d", "snap.json") == ["d/sub/deep/b.jpg"]
+    assert scan("d", "snap.json") == []
+
+
+def test_failed_read_keeps_cached_entry(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    touch("d/a.jpg")
+    touch("d/sub/deep/b.jpg")
+    assert scan("d", "snap.json") == ["d/a.jpg", "d/sub/deep/b.jpg"]
+
+    touch("d/sub/c.jpg")
+    fail_scandir_once(monkeypatch, os.path.join("d", "sub"))
+    assert scan("d", "snap.json") == []
+    assert scan("d", "snap.json") == ["d/sub/c.jpg"]
+
+
+def test_failed_subdirectory_read_without_snapshot(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    touch("d/a.jpg")
+    touch("d/sub/b.jpg")
+
+    fail_scandir_once(monkeypatch, os.path.join("d", "sub"))
+    assert names(iter_files("d", recursive=True)) == ["d/a.jpg"]
+    assert "Fehler beim Lesen" in capsys.readouterr().out
+
+
+def test_missing_root_raises(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(FileNotFoundError):
+        list(iter_files("missing"))
+
+
+def test_missing_root_keeps_snapshot(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    touch("d/a.jpg")
+    touch("d/sub/b.jpg")
+    assert scan("d", "snap.json") == ["d/a.jpg", "d/sub/b.jpg"]
+    saved = load_json("snap.json")
+
+    os.rename("d", "d_unmounted")
+    with pytest.raises(FileNotFoundError):
+        scan("d", "snap.json")
+    assert load_json("snap.json") == saved
+
+    os.rename("d_unmounted", "d")
+    assert scan("d", "snap.json") == []
+
+
+def test_processed_log(tmp_path):
+    log_file = str(tmp_path / "processed.txt")
+    with ProcessedLog(log_file) as processed:
+        assert "a.jpg" not in processed
+        processed.mark_done("a.jpg")
+        processed.mark_done("a.jpg")
+        assert "a.jpg" in processed
+
+    with ProcessedLog(log_file) as processed:
+        assert "a.jpg" in processed
+        assert "b.jpg" not in processed
+        processed.mark_done("b.jpg")
+
+    with open(log_file, encoding='utf-8') as file:
+        assert file.read() == "a.jpg\nb.jpg\n"